@@ -4,17 +4,59 @@ Generate 1000 Bangla questions across 13 namjari tags using OpenAI gpt-5.
 Final production version with streaming display and proper CSV output.
 """
 
+import asyncio
+import contextlib
 import csv
+import hashlib
+import json
+import logging
+import logging.handlers
 import os
+import queue
+import random
+import re
+import sys
 import time
+import unicodedata
 from collections import defaultdict
-from openai import OpenAI
+from itertools import chain
+from openai import APIConnectionError, APIStatusError, APITimeoutError, AsyncOpenAI, InternalServerError, RateLimitError
+
+try:
+    from orjson import loads as json_loads  # ~3x faster on large Bangla UTF-8 payloads
+except ImportError:
+    json_loads = json.loads
 
 # Configuration
 MODEL = "gpt-5"
 TARGET_ROWS = 1000
 OUTPUT_DIR = "namjari_questions"
-MAX_COMPLETION_TOKENS = 25000  # Reasonable limit per tag: ~15k reasoning + ~10k output
+MAX_COMPLETION_TOKENS = 25000  # Hard cap per tag; the actual budget is sized from the questions needed
+AVG_TOKENS_PER_QUESTION = 60  # Typical Bangla question length in output tokens
+TOKEN_SAFETY_FACTOR = 1.3  # Headroom over the average for longer questions and duplicates
+REASONING_TOKEN_BUDGET = 15000  # Reasoning tokens gpt-5 spends before writing the list
+MAX_CONCURRENT_REQUESTS = 8  # Tags generated in parallel; keep under the account RPM limit
+MAX_REQUESTS_PER_MINUTE = 500  # Account RPM budget; every API attempt takes one request slot
+MAX_TOKENS_PER_MINUTE = 400000  # Account TPM budget; requests are paced to stay under it
+PROBE_RATE_LIMITS = True  # Replace the two limits above with the account's own, read from a 1-token probe
+MAX_API_ATTEMPTS = 5  # Attempts per request on rate-limit/server/connection/timeout errors
+RETRY_MAX_WAIT = 60  # Upper bound (seconds) for the jittered exponential backoff
+GENERATION_MODE = "per_tag"  # "per_tag": one request per tag, "grouped": TAGS_PER_REQUEST tags per JSON request, "bulk": all tags in one JSON request, "batch": OpenAI Batch API
+TAGS_PER_REQUEST = 5  # Group size for "grouped" mode; keeps each response well inside BULK_MAX_COMPLETION_TOKENS
+BULK_MAX_COMPLETION_TOKENS = 100000  # Single bulk request covers every tag's output
+BATCH_INPUT_FILE = "namjari_batch_requests.jsonl"  # Batch API request file (one line per tag)
+BATCH_STATE_FILE = "namjari_batch_state.json"  # Id of the in-flight batch so an interrupted run resumes polling it
+BATCH_POLL_INITIAL_INTERVAL = 10  # Seconds; doubles up to BATCH_POLL_MAX_INTERVAL
+BATCH_POLL_MAX_INTERVAL = 300
+RESPONSE_CACHE_DIR = ".namjari_cache"  # Raw completions keyed by request content; None disables the cache
+PROMPT_VERSION = 1  # Bump whenever the prompts change so cached completions are not reused
+CSV_BUFFER_SIZE = 1 << 20  # Bulk/batch CSVs are written in one go, so buffer the whole file
+VERBOSE = False  # Log every seed and generated question as it is written (same as LOG_LEVEL=DEBUG)
+
+SYSTEM_PROMPT_BASE = "You are an expert Bengali question generator specializing in land registration (namjari) topics. Your task is to generate questions that are 97-99% IDENTICAL to provided examples in style, structure, vocabulary, and tone. Follow the exact patterns shown in examples."
+SYSTEM_PROMPT = SYSTEM_PROMPT_BASE + " Generate only pure questions, one per line, with no numbering, bullets, or extra text."
+JSON_SYSTEM_PROMPT = SYSTEM_PROMPT_BASE + " Respond only with the requested JSON object; every question is a plain string with no numbering, bullets, or extra text."
+JSON_OUTPUT_INSTRUCTION = 'Return ONLY a JSON object of the form {"questions": ["...", "..."]}.'
 
 # Seed data for 13 tags
 SEED_DATA = {
@@ -108,254 +150,333 @@ SEED_DATA = {
     ]
 }
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# 429s, 5xx responses and network failures are transient; other API errors (4xx) are not
+RETRYABLE_ERRORS = (RateLimitError, InternalServerError, APIConnectionError, APITimeoutError)
+
+class TokenBucket:
+    """Async token bucket refilled continuously at `per_minute` units (requests or tokens)."""
+    
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.tokens = per_minute
+        self.refill_per_second = per_minute / 60
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+    
+    async def acquire(self, amount):
+        """Wait until `amount` tokens are available, then take them."""
+        amount = min(amount, self.capacity)
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.refill_per_second)
+
+log = logging.getLogger("namjari")
+
+def start_log_listener():
+    """Send log records through a queue so stdout writes happen on a background thread."""
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(logging.handlers.QueueHandler(log_queue))
+    # LOG_LEVEL=WARNING keeps only problems; DEBUG adds every written question
+    log.setLevel(os.getenv("LOG_LEVEL", "DEBUG" if VERBOSE else "INFO").upper())
+    log.propagate = False
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    return listener
+
+# The SDK's own retries are disabled so create_completion's backoff is the only retry layer
+client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+request_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+request_bucket = TokenBucket(MAX_REQUESTS_PER_MINUTE)
+token_bucket = TokenBucket(MAX_TOKENS_PER_MINUTE)
+rate_limit_probe = None  # Started by the first real request, so cached or complete runs send none
+
+async def configure_rate_limits():
+    """Size the RPM/TPM buckets from the x-ratelimit-limit-* headers of a one-token probe request."""
+    global request_bucket, token_bucket
+    try:
+        raw = await client.chat.completions.with_raw_response.create(
+            model=MODEL,
+            messages=[{"role": "user", "content": "."}],
+            max_completion_tokens=1,
+        )
+        headers = raw.headers
+    except APIStatusError as e:
+        headers = e.response.headers  # Error responses carry the same rate-limit headers
+    except Exception as e:
+        log.warning(f"⚠️  Rate-limit probe failed ({e}); keeping configured limits")
+        return
+    
+    rpm = headers.get("x-ratelimit-limit-requests", "")
+    tpm = headers.get("x-ratelimit-limit-tokens", "")
+    if rpm.isdigit():
+        request_bucket = TokenBucket(int(rpm))
+    if tpm.isdigit():
+        token_bucket = TokenBucket(int(tpm))
+    log.info(f"🚦 Account limits: {request_bucket.capacity} requests/min, {token_bucket.capacity} tokens/min")
+
+def estimate_request_tokens(api_params):
+    """Rough TPM cost of a request: prompt characters / 2 plus the completion budget."""
+    prompt_chars = sum(len(message["content"]) for message in api_params["messages"])
+    return prompt_chars // 2 + (api_params.get("max_completion_tokens") or 0)
+
+async def create_completion(api_params):
+    """chat.completions.create with RPM/TPM pacing (sized by a one-time probe) and jittered backoff on transient errors."""
+    global rate_limit_probe
+    if PROBE_RATE_LIMITS and rate_limit_probe is None:
+        rate_limit_probe = asyncio.ensure_future(configure_rate_limits())
+    if rate_limit_probe is not None:
+        await rate_limit_probe  # Concurrent first requests all wait for the one probe
+    request_tokens = estimate_request_tokens(api_params)
+    for attempt in range(1, MAX_API_ATTEMPTS + 1):
+        # Pace every attempt, retries included, so backoff never bursts past the limits
+        await request_bucket.acquire(1)
+        await token_bucket.acquire(request_tokens)
+        try:
+            return await client.chat.completions.create(**api_params)
+        except RETRYABLE_ERRORS as e:
+            if attempt == MAX_API_ATTEMPTS:
+                raise
+            wait = random.uniform(0, min(RETRY_MAX_WAIT, 2 ** attempt))
+            log.warning(f"⚠️  {type(e).__name__}: retrying in {wait:.1f}s (attempt {attempt}/{MAX_API_ATTEMPTS})")
+            await asyncio.sleep(wait)
+
+BANGLA_CHAR_RE = re.compile(r'[\u0980-\u09FF]')
+STRIP_QUOTES = str.maketrans('', '', '"\'')
 
 def clean_question(text):
     """Basic cleaning of question text."""
-    return text.strip().replace('"', '').replace("'", '')
+    return text.strip().translate(STRIP_QUOTES)
+
+# Per-tag exclusions: (kind, excluded tag, example count or None for all) plus the closing rule.
+# Tags not listed fall back to the first three other tags with one example each.
+EXCLUSION_MAP = {
+    'namjari_process': (
+        [('document', 'namjari_required_documents', 1), ('fee', 'namjari_fee', 1),
+         ('inheritance', 'namjari_inheritance_documents', 1), ('status', 'namjari_status_check', 1)],
+        "❌ ONLY generate general process questions like your examples!",
+    ),
+    'namjari_application_procedure': (
+        [('document', 'namjari_required_documents', None), ('representative', 'namjari_by_representative', None),
+         ('fee', 'namjari_fee', None)],
+        "❌ ONLY generate self-capability questions with 'নিজে', 'আমি নিজে' patterns!",
+    ),
+    'namjari_fee': (
+        [('process', 'namjari_process', None), ('document', 'namjari_required_documents', None),
+         ('hearing', 'namjari_hearing_notification', None)],
+        "❌ ONLY generate cost/fee questions with 'ফি', 'টাকা', 'খরচ', 'সরকারি'!",
+    ),
+}
 
 def get_cross_tag_exclusions(current_tag):
     """Generate explicit exclusion rules with concrete examples to prevent cross-tag contamination."""
+    if current_tag in EXCLUSION_MAP:
+        exclusions, final_rule = EXCLUSION_MAP[current_tag]
+    else:
+        excluded_tags = [tag for tag in SEED_DATA if tag != current_tag][:3]
+        exclusions = [('', tag, 1) for tag in excluded_tags]
+        final_rule = f"❌ ONLY generate questions that fit {current_tag} domain!"
     
-    # Build exclusion rules dynamically using actual SEED_DATA
     exclusion_rules = []
+    for kind, excluded_tag, count in exclusions:
+        label = f"{kind} questions" if kind else "questions"
+        exclusion_rules.append(f"❌ DON'T generate {label} like these (belongs to {excluded_tag}):")
+        exclusion_rules.extend(f"   • \"{example}\"" for example in SEED_DATA[excluded_tag][:count])
+    exclusion_rules.append(final_rule)
     
-    if current_tag == 'namjari_process':
-        exclusion_rules.extend([
-            "❌ DON'T generate document questions like these (belongs to namjari_required_documents):",
-        ])
-        for example in SEED_DATA['namjari_required_documents'][:1]:  # Show only 1 example for efficiency
-            exclusion_rules.append(f"   • \"{example}\"")
-        
-        exclusion_rules.extend([
-            "❌ DON'T generate fee questions like these (belongs to namjari_fee):",
-        ])
-        for example in SEED_DATA['namjari_fee'][:1]:  # Show only 1 example for efficiency
-            exclusion_rules.append(f"   • \"{example}\"")
-        
-        exclusion_rules.extend([
-            "❌ DON'T generate inheritance questions like these (belongs to namjari_inheritance_documents):",
-        ])
-        for example in SEED_DATA['namjari_inheritance_documents'][:1]:  # Show only 1 example for efficiency
-            exclusion_rules.append(f"   • \"{example}\"")
-        
-        exclusion_rules.extend([
-            "❌ DON'T generate status questions like these (belongs to namjari_status_check):",
-        ])
-        for example in SEED_DATA['namjari_status_check'][:1]:  # Show only 1 example for efficiency
-            exclusion_rules.append(f"   • \"{example}\"")
-        
-        exclusion_rules.append("❌ ONLY generate general process questions like your examples!")
-    
-    elif current_tag == 'namjari_application_procedure':
-        exclusion_rules.extend([
-            "❌ DON'T generate document questions like these (belongs to namjari_required_documents):",
-        ])
-        for example in SEED_DATA['namjari_required_documents']:
-            exclusion_rules.append(f"   • \"{example}\"")
-        
-        exclusion_rules.extend([
-            "❌ DON'T generate representative questions like these (belongs to namjari_by_representative):",
-        ])
-        for example in SEED_DATA['namjari_by_representative']:
-            exclusion_rules.append(f"   • \"{example}\"")
-        
-        exclusion_rules.extend([
-            "❌ DON'T generate fee questions like these (belongs to namjari_fee):",
-        ])
-        for example in SEED_DATA['namjari_fee']:
-            exclusion_rules.append(f"   • \"{example}\"")
-        
-        exclusion_rules.append("❌ ONLY generate self-capability questions with 'নিজে', 'আমি নিজে' patterns!")
-    
-    elif current_tag == 'namjari_fee':
-        exclusion_rules.extend([
-            "❌ DON'T generate process questions like these (belongs to namjari_process):",
-        ])
-        for example in SEED_DATA['namjari_process']:
-            exclusion_rules.append(f"   • \"{example}\"")
-        
-        exclusion_rules.extend([
-            "❌ DON'T generate document questions like these (belongs to namjari_required_documents):",
-        ])
-        for example in SEED_DATA['namjari_required_documents']:
-            exclusion_rules.append(f"   • \"{example}\"")
-        
-        exclusion_rules.extend([
-            "❌ DON'T generate hearing questions like these (belongs to namjari_hearing_notification):",
-        ])
-        for example in SEED_DATA['namjari_hearing_notification']:
-            exclusion_rules.append(f"   • \"{example}\"")
-        
-        exclusion_rules.append("❌ ONLY generate cost/fee questions with 'ফি', 'টাকা', 'খরচ', 'সরকারি'!")
-    
-    else:
-        # For other tags, create a more generic exclusion pattern
-        excluded_tags = [tag for tag in SEED_DATA.keys() if tag != current_tag][:3]  # Show top 3 most different tags
-        for excluded_tag in excluded_tags:
-            exclusion_rules.append(f"❌ DON'T generate questions like these (belongs to {excluded_tag}):")
-            for example in SEED_DATA[excluded_tag][:1]:  # Show 1 example per excluded tag for efficiency
-                exclusion_rules.append(f"   • \"{example}\"")
-        
-        exclusion_rules.append(f"❌ ONLY generate questions that fit {current_tag} domain!")
-    
-    return "\n".join(exclusion_rules) if exclusion_rules else "❌ Stay strictly within this tag's domain"
+    return "\n".join(exclusion_rules)
+
+# Tag-specific vocabulary mapping
+TAG_VOCABULARIES = {
+    'namjari_process': ['সেবা', 'খারিজ', 'মিউটেশন', 'অনলাইনে'],
+    'namjari_application_procedure': ['নিজে', 'ভূমি অফিস', 'সাহায্যে', 'আমি নিজে'],
+    'namjari_registration': ['নিবন্ধন', 'মোবাইল', 'এনআইডি', 'জন্মনিবন্ধন'],
+    'namjari_by_representative': ['প্রতিনিধি', 'বিদেশে', 'ভাই', 'আত্মীয়'],
+    'namjari_eligibility': ['কখন', 'জমি কিনেছি', 'পিতা মারা গেছেন', 'দলিল করে'],
+    'namjari_required_documents': ['দলিল', 'ছবি', 'এনআইডি', 'ফটোকপি'],
+    'namjari_inheritance_documents': ['ওয়ারিশ', 'বাবা মারা গেছেন', 'বন্টননামা'],
+    'namjari_fee': ['ফি', 'টাকা', 'খরচ', 'সরকারি'],
+    'namjari_hearing_notification': ['শুনানী', 'নোটিশ', 'মোবাইল করে', 'পোস্ট অফিস'],
+    'namjari_hearing_documents': ['শুনানীর জন্য', 'কাগজপত্র', 'আবেদনকারী'],
+    'namjari_status_check': ['মামলা', 'অবস্থায়', 'স্ট্যাটাস', 'জানবো কিভাবে'],
+    'namjari_rejected_appeal': ['নামঞ্জুর', 'আদালত', 'এসি (ল্যান্ড)', 'আবার আবেদন'],
+    'namjari_khatian_copy': ['মঞ্জুর', 'খতিয়ান কপি', 'উঠাতে', 'প্রিন্ট কপি'],
+    'namjari_khatian_correction': ['ভুল', 'সংশোধন', 'নাম ভুল', 'জমির পরিমাণ']
+}
+
+# Tag-specific contexts and tones
+TAG_CONTEXTS = {
+    'namjari_process': 'General service inquiry tone - seeking basic information',
+    'namjari_application_procedure': 'Self-capability concern tone - "আমি নিজে" patterns',
+    'namjari_registration': 'Technical requirement tone - system setup focus',
+    'namjari_by_representative': 'Delegation concern tone - long conditional questions',
+    'namjari_eligibility': 'Situational qualification tone - life event contexts',
+    'namjari_required_documents': 'Document-focused tone - practical requirements',
+    'namjari_inheritance_documents': 'Emotional family tone - death/inheritance context',
+    'namjari_fee': 'Cost-conscious tone - purely financial focus',
+    'namjari_hearing_notification': 'Information-seeking tone - "কিভাবে জানবো" patterns',
+    'namjari_hearing_documents': 'Preparation-focused tone - "কি নিয়ে যাবো" patterns',
+    'namjari_status_check': 'Anxious follow-up tone - tracking progress',
+    'namjari_rejected_appeal': 'Problem-solving tone - dealing with rejection',
+    'namjari_khatian_copy': 'Success-phase tone - getting final documents',
+    'namjari_khatian_correction': 'Error-fixing tone - correcting mistakes'
+}
+
+STARTER_RE = re.compile(r'^(কিভাবে|কি |কত|কোথায়|আমি)')
+# Lookaheads keep the word-order-independent "contains both" checks in a single search
+STRUCTURE_PATTERNS = [
+    (re.compile(r'কি করতে হবে'), 'X কি করতে হবে?'),
+    (re.compile(r'^(?=.*কিভাবে)(?=.*পারি)', re.S), 'X কিভাবে Y পারি?'),
+    (re.compile(r'^(?=.*কিভাবে)(?=.*পাবো)', re.S), 'X কিভাবে Y পাবো?'),
+    (re.compile(r'^(?=.*কত)(?=.*লাগে)', re.S), 'কত X লাগে?'),
+]
+# Zero-width matches so overlapping phrases ('নিজে' inside 'আমি নিজে') are all found
+VOCAB_RE = {
+    tag: re.compile('(?=(' + '|'.join(map(re.escape, phrases)) + '))')
+    for tag, phrases in TAG_VOCABULARIES.items()
+}
 
 def analyze_question_patterns(seed_questions, tag):
     """Advanced pattern analysis capturing vocabulary, tone, context, and distinctions."""
     
-    # Tag-specific vocabulary mapping
-    tag_vocabularies = {
-        'namjari_process': ['সেবা', 'খারিজ', 'মিউটেশন', 'অনলাইনে'],
-        'namjari_application_procedure': ['নিজে', 'ভূমি অফিস', 'সাহায্যে', 'আমি নিজে'],
-        'namjari_registration': ['নিবন্ধন', 'মোবাইল', 'এনআইডি', 'জন্মনিবন্ধন'],
-        'namjari_by_representative': ['প্রতিনিধি', 'বিদেশে', 'ভাই', 'আত্মীয়'],
-        'namjari_eligibility': ['কখন', 'জমি কিনেছি', 'পিতা মারা গেছেন', 'দলিল করে'],
-        'namjari_required_documents': ['দলিল', 'ছবি', 'এনআইডি', 'ফটোকপি'],
-        'namjari_inheritance_documents': ['ওয়ারিশ', 'বাবা মারা গেছেন', 'বন্টননামা'],
-        'namjari_fee': ['ফি', 'টাকা', 'খরচ', 'সরকারি'],
-        'namjari_hearing_notification': ['শুনানী', 'নোটিশ', 'মোবাইল করে', 'পোস্ট অফিস'],
-        'namjari_hearing_documents': ['শুনানীর জন্য', 'কাগজপত্র', 'আবেদনকারী'],
-        'namjari_status_check': ['মামলা', 'অবস্থায়', 'স্ট্যাটাস', 'জানবো কিভাবে'],
-        'namjari_rejected_appeal': ['নামঞ্জুর', 'আদালত', 'এসি (ল্যান্ড)', 'আবার আবেদন'],
-        'namjari_khatian_copy': ['মঞ্জুর', 'খতিয়ান কপি', 'উঠাতে', 'প্রিন্ট কপি'],
-        'namjari_khatian_correction': ['ভুল', 'সংশোধন', 'নাম ভুল', 'জমির পরিমাণ']
-    }
-    
-    # Tag-specific contexts and tones
-    tag_contexts = {
-        'namjari_process': 'General service inquiry tone - seeking basic information',
-        'namjari_application_procedure': 'Self-capability concern tone - "আমি নিজে" patterns',
-        'namjari_registration': 'Technical requirement tone - system setup focus',
-        'namjari_by_representative': 'Delegation concern tone - long conditional questions',
-        'namjari_eligibility': 'Situational qualification tone - life event contexts',
-        'namjari_required_documents': 'Document-focused tone - practical requirements',
-        'namjari_inheritance_documents': 'Emotional family tone - death/inheritance context',
-        'namjari_fee': 'Cost-conscious tone - purely financial focus',
-        'namjari_hearing_notification': 'Information-seeking tone - "কিভাবে জানবো" patterns',
-        'namjari_hearing_documents': 'Preparation-focused tone - "কি নিয়ে যাবো" patterns',
-        'namjari_status_check': 'Anxious follow-up tone - tracking progress',
-        'namjari_rejected_appeal': 'Problem-solving tone - dealing with rejection',
-        'namjari_khatian_copy': 'Success-phase tone - getting final documents',
-        'namjari_khatian_correction': 'Error-fixing tone - correcting mistakes'
-    }
-    
     # Extract actual patterns from seed questions
     question_starters = []
     structures = []
     key_phrases = []
     
     for q in seed_questions:
-        # Question starter analysis
-        if q.startswith('কিভাবে'):
-            question_starters.append('কিভাবে')
-        elif q.startswith('কি '):
-            question_starters.append('কি')
-        elif q.startswith('কত'):
-            question_starters.append('কত')
-        elif q.startswith('কোথায়'):
-            question_starters.append('কোথায়')
-        elif q.startswith('আমি'):
-            question_starters.append('আমি')
-        
-        # Structure analysis
-        if 'কি করতে হবে' in q:
-            structures.append('X কি করতে হবে?')
-        if 'কিভাবে' in q and 'পারি' in q:
-            structures.append('X কিভাবে Y পারি?')
-        if 'কিভাবে' in q and 'পাবো' in q:
-            structures.append('X কিভাবে Y পাবো?')
-        if 'কত' in q and 'লাগে' in q:
-            structures.append('কত X লাগে?')
-        
-        # Extract unique phrases
-        for phrase in tag_vocabularies.get(tag, []):
-            if phrase in q:
-                key_phrases.append(phrase)
+        starter = STARTER_RE.match(q)
+        if starter:
+            question_starters.append(starter.group(1).strip())
+        structures.extend(label for pattern, label in STRUCTURE_PATTERNS if pattern.search(q))
+        if tag in VOCAB_RE:
+            found = set(VOCAB_RE[tag].findall(q))
+            key_phrases.extend(phrase for phrase in TAG_VOCABULARIES[tag] if phrase in found)
     
     analysis = f"""
 ADVANCED PATTERN ANALYSIS FOR {tag.upper()}:
 
-🎯 TAG-SPECIFIC CONTEXT: {tag_contexts.get(tag, 'Standard namjari context')}
+🎯 TAG-SPECIFIC CONTEXT: {TAG_CONTEXTS.get(tag, 'Standard namjari context')}
 
-🗣️ QUESTION STARTERS: {', '.join(set(question_starters)) if question_starters else 'Mixed'}
-📝 SENTENCE STRUCTURES: {', '.join(set(structures)) if structures else 'Varied'}
-💬 CRITICAL VOCABULARY: {', '.join(set(key_phrases)) if key_phrases else 'Standard'}
-📊 EXPECTED VOCABULARY: {', '.join(tag_vocabularies.get(tag, ['নামজারি']))}
+🗣️ QUESTION STARTERS: {', '.join(dict.fromkeys(question_starters)) if question_starters else 'Mixed'}
+📝 SENTENCE STRUCTURES: {', '.join(dict.fromkeys(structures)) if structures else 'Varied'}
+💬 CRITICAL VOCABULARY: {', '.join(dict.fromkeys(key_phrases)) if key_phrases else 'Standard'}
+📊 EXPECTED VOCABULARY: {', '.join(TAG_VOCABULARIES.get(tag, ['নামজারি']))}
 
 ⚡ GENERATION RULES FOR THIS TAG:
-1. MUST use the exact vocabulary: {', '.join(tag_vocabularies.get(tag, ['নামজারি']))}
-2. MUST match the tone: {tag_contexts.get(tag, 'Standard')}
-3. MUST follow structures: {', '.join(set(structures)) if structures else 'Same as examples'}
-4. MUST start questions like examples: {', '.join(set(question_starters)) if question_starters else 'Varied starters'}
+1. MUST use the exact vocabulary: {', '.join(TAG_VOCABULARIES.get(tag, ['নামজারি']))}
+2. MUST match the tone: {TAG_CONTEXTS.get(tag, 'Standard')}
+3. MUST follow structures: {', '.join(dict.fromkeys(structures)) if structures else 'Same as examples'}
+4. MUST start questions like examples: {', '.join(dict.fromkeys(question_starters)) if question_starters else 'Varied starters'}
 
 ⭐ CRITICAL: This tag is DISTINCT from all others - maintain its unique vocabulary and context!"""
     
     return analysis
 
-def display_generated_text_streaming(generated_text, tag):
-    """Display generated text with streaming effect and return cleaned lines."""
-    print(f"📺 Generated content for {tag}:")
-    print("=" * 80)
-    
-    lines = generated_text.strip().split('\n')
-    cleaned_lines = []
-    
-    for line in lines:
-        clean_line = clean_question(line)
-        if len(clean_line) > 5 and any('\u0980' <= char <= '\u09FF' for char in clean_line):
-            print(f"✨ {clean_line}")
-            cleaned_lines.append(clean_line)
-            time.sleep(0.1)  # Small delay for streaming effect
-    
-    print("=" * 80)
-    return cleaned_lines
+# Both depend only on the static SEED_DATA, so build them once at import
+EXCLUSION_RULES = {tag: get_cross_tag_exclusions(tag) for tag in SEED_DATA}
+PATTERN_ANALYSIS = {tag: analyze_question_patterns(SEED_DATA[tag], tag) for tag in SEED_DATA}
 
-def generate_questions_for_tag(tag, seed_questions, target_count):
-    """Generate questions for a tag and stream to file."""
-    
-    # Create output directory
-    if not os.path.exists(OUTPUT_DIR):
-        os.makedirs(OUTPUT_DIR)
+def question_key(clean_q):
+    """Whitespace-normalised key used to drop duplicate questions."""
+    return ' '.join(clean_q.split())
+
+def parse_json_object(generated_text):
+    """Parse a JSON-mode response body; malformed or non-object output yields {}."""
+    try:
+        payload = json_loads(generated_text or "{}")
+    except ValueError as e:
+        log.warning(f"⚠️  Could not parse JSON response: {e}")
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+def extract_questions(payload, key="questions"):
+    """Return the question strings stored under `key` in a parsed JSON response."""
+    questions = payload.get(key, [])
+    if not isinstance(questions, list):
+        return []
+    return [q for q in questions if isinstance(q, str)]
+
+def find_overlapping_seeds(seed_data):
+    """Return {seed hash: [(tag, seed), ...]} for seeds that appear under more than one tag.
     
-    # Create file and write header immediately
-    filename = f"{tag}.csv"
-    filepath = os.path.join(OUTPUT_DIR, filename)
+    Seeds are compared after cleaning, NFC normalisation and whitespace
+    folding, so trivially different spellings of the same question collide.
+    """
+    seen = defaultdict(list)
+    for tag, seeds in seed_data.items():
+        for seed in seeds:
+            normalized = unicodedata.normalize('NFC', question_key(clean_question(seed)))
+            digest = hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).hexdigest()
+            seen[digest].append((tag, seed))
+    return {
+        digest: entries for digest, entries in seen.items()
+        if len({tag for tag, _ in entries}) > 1
+    }
+
+def request_digest(request_fields):
+    """Stable hash of everything that shapes a completion: model, prompt version and request content."""
+    payload = {"model": MODEL, "prompt_version": PROMPT_VERSION, **request_fields}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+def response_cache_path(request_fields):
+    """Cache file for a request, keyed by its request_digest."""
+    if RESPONSE_CACHE_DIR is None:
+        return None
+    return os.path.join(RESPONSE_CACHE_DIR, f"{request_digest(request_fields)}.json")
+
+def load_cached_response(cache_path):
+    """Return the cached completion text, or None on a miss."""
+    if cache_path is None:
+        return None
+    try:
+        with open(cache_path, 'rb') as f:
+            return json_loads(f.read())["text"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+def save_cached_response(cache_path, text):
+    """Store a completion atomically so an interrupted run never leaves a truncated entry."""
+    if cache_path is None or not text:
+        return
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"model": MODEL, "text": text}, f, ensure_ascii=False)
+    os.replace(tmp_path, cache_path)
+
+def discard_cached_response(cache_path):
+    """Remove a cache entry that turned out to be useless; a missing entry is fine."""
+    if cache_path is not None:
+        with contextlib.suppress(OSError):
+            os.remove(cache_path)
+
+def read_existing_questions(filepath):
+    """Questions already in a tag's CSV from an earlier run; empty if the file is missing."""
+    try:
+        with open(filepath, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+    except OSError:
+        return []
+    return [row[0] for row in rows[1:] if row]
+
+def is_valid_question(clean_line):
+    """Keep only non-trivial lines that contain Bangla text."""
+    return len(clean_line) > 5 and BANGLA_CHAR_RE.search(clean_line) is not None
+
+def build_generation_prompt(tag, seed_questions, questions_needed):
+    """Build the per-tag user prompt asking for questions that mirror the seeds."""
+    examples = "\n".join(seed_questions)
     
-    print(f"\n🏷️  Processing: {tag}")
-    print(f"📁 Creating: {filepath}")
-    print(f"🎯 Target: {target_count} questions")
+    pattern_analysis = PATTERN_ANALYSIS[tag]
     
-    with open(filepath, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
-        writer.writerow(['question', 'tag'])
-        
-        # Write seed questions first  
-        print(f"📝 Writing {len(seed_questions)} seed questions...")
-        for i, seed in enumerate(seed_questions, 1):
-            clean_q = clean_question(seed)
-            writer.writerow([clean_q, tag])
-            f.flush()
-            print(f"  {i:2d}. {clean_q}")
-        
-        seed_count = len(seed_questions)
-        print(f"✅ Wrote {seed_count} seed questions")
-        
-        # Generate more if needed
-        questions_needed = target_count - seed_count
-        if questions_needed <= 0:
-            print(f"✅ Target reached with seeds only")
-            return filepath
-        
-        print(f"🤖 Generating {questions_needed} new questions...")
-        
-        # Create highly specific prompt for maximum similarity
-        examples = "\n".join(seed_questions)
-        
-        # Analyze patterns in seed questions for this tag
-        pattern_analysis = analyze_question_patterns(seed_questions, tag)
-        
-        prompt = f"""Generate {questions_needed} new Bengali questions that are 97-99% IDENTICAL in style, structure, and vocabulary to these examples:
+    return f"""Generate {questions_needed} new Bengali questions that are 97-99% IDENTICAL in style, structure, and vocabulary to these examples:
 
 {examples}
 
@@ -373,7 +494,7 @@ PATTERN ANALYSIS FOR THIS TAG:
 
 🚨 CROSS-TAG CONTAMINATION GUARDRAILS:
 NEVER generate questions that could fit these OTHER tags:
-{get_cross_tag_exclusions(tag)}
+{EXCLUSION_RULES[tag]}
 
 EXAMPLE OF WHAT TO DO:
 If example is: "নামজারি সেবা কিভাবে পেতে পারি?"
@@ -382,74 +503,492 @@ Generate like: "নামজারি সেবা কিভাবে নিত
 
 Generate EXACTLY {questions_needed} questions following these patterns:"""
 
+def completion_token_budget(questions_needed, cap=MAX_COMPLETION_TOKENS):
+    """max_completion_tokens sized to the requested output plus reasoning, never above `cap`."""
+    budget = int(questions_needed * AVG_TOKENS_PER_QUESTION * TOKEN_SAFETY_FACTOR) + REASONING_TOKEN_BUDGET
+    return budget if cap is None else min(budget, cap)
+
+def build_api_params(prompt, questions_needed, json_output=False):
+    """Chat-completion parameters for one per-tag prompt.
+    
+    With json_output the model answers {"questions": [...]} in JSON mode
+    instead of one question per line.
+    """
+    if json_output:
+        api_params = {
+            "model": MODEL,
+            "messages": [
+                {"role": "system", "content": JSON_SYSTEM_PROMPT},
+                {"role": "user", "content": f"{prompt}\n\n{JSON_OUTPUT_INSTRUCTION}"}
+            ],
+            "response_format": {"type": "json_object"},
+        }
+    else:
+        api_params = {
+            "model": MODEL,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ]
+        }
+    
+    # Right-sized budgets keep TPM reservations close to what the request really uses
+    api_params["max_completion_tokens"] = completion_token_budget(questions_needed)
+    
+    return api_params
+
+async def generate_questions_for_tag(tag, seed_questions, target_count):
+    """Generate questions for a tag, streaming each completed line straight to its CSV.
+    
+    Returns (filepath, number of question rows written).
+    """
+    
+    # Create file and write header immediately
+    filename = f"{tag}.csv"
+    filepath = os.path.join(OUTPUT_DIR, filename)
+    
+    log.info(f"\n🏷️  Processing: {tag}")
+    log.info(f"📁 Creating: {filepath}")
+    log.info(f"🎯 Target: {target_count} questions")
+    
+    existing_questions = read_existing_questions(filepath)
+    if len(existing_questions) >= target_count:
+        log.info(f"✅ Already complete with {len(existing_questions)} questions, skipping")
+        return filepath, len(existing_questions)
+    
+    # A file left by an interrupted run that already holds the seeds is topped up in place
+    seed_count = len(seed_questions)
+    resuming = bool(existing_questions) and len(existing_questions) >= seed_count
+    base_count = len(existing_questions) if resuming else seed_count
+    questions_needed = target_count - base_count
+    
+    request_fields = {"tag": tag, "seeds": seed_questions, "target": target_count}
+    if resuming:
+        # A top-up asks for a different number of questions; replaying the completion that left the
+        # file short would only yield duplicates of rows already on disk
+        request_fields.update(base_count=base_count, questions_needed=questions_needed)
+    cache_path = response_cache_path(request_fields)
+    cached_text = load_cached_response(cache_path) if questions_needed > 0 else None
+    needs_api = questions_needed > 0 and cached_text is None
+    
+    stream_task = None
+    async with request_semaphore if needs_api else contextlib.nullcontext():
+        if needs_api:
+            # Create highly specific prompt for maximum similarity
+            api_params = build_api_params(build_generation_prompt(tag, seed_questions, questions_needed), questions_needed)
+            # Put the request on the wire first so the seed writes below overlap the model's latency
+            stream_task = asyncio.create_task(create_completion({**api_params, "stream": True}))
+            await asyncio.sleep(0)
         try:
-            print("🔄 Calling OpenAI...")
-            
-            # Prepare API call parameters
-            api_params = {
-                "model": MODEL,
-                "messages": [
-                    {"role": "system", "content": "You are an expert Bengali question generator specializing in land registration (namjari) topics. Your task is to generate questions that are 97-99% IDENTICAL to provided examples in style, structure, vocabulary, and tone. Follow the exact patterns shown in examples. Generate only pure questions, one per line, with no numbering, bullets, or extra text."},
-                    {"role": "user", "content": prompt}
-                ]
-            }
-            
-            # Add max_completion_tokens only if specified
-            if MAX_COMPLETION_TOKENS is not None:
-                api_params["max_completion_tokens"] = MAX_COMPLETION_TOKENS
-                print(f"🎛️  Using custom token limit: {MAX_COMPLETION_TOKENS}")
-            else:
-                print("🎛️  Using OpenAI default token limits")
-            
-            response = client.chat.completions.create(**api_params)
-            
-            # Extract and display generated text with streaming
-            generated_text = response.choices[0].message.content
-            print(f"📡 Generated text length: {len(generated_text) if generated_text else 0} characters")
-            
-            # Debug: print response details if empty
-            if not generated_text or len(generated_text.strip()) == 0:
-                print(f"⚠️  Empty response detected!")
-                print(f"🔍 Response object: {response}")
-                print(f"🔍 Response choices: {len(response.choices) if response.choices else 0}")
-                if response.choices and len(response.choices) > 0:
-                    print(f"🔍 First choice: {response.choices[0]}")
-                    print(f"🔍 Message content: '{response.choices[0].message.content}'")
-            
-            # Display generated text with streaming effect and get cleaned lines
-            cleaned_lines = display_generated_text_streaming(generated_text, tag)
-            
-            # Add cleaned questions to CSV
-            added_count = 0
-            print(f"📝 Writing {len(cleaned_lines)} valid questions to CSV...")
-            
-            for clean_q in cleaned_lines:
-                writer.writerow([clean_q, tag])
-                f.flush()
-                added_count += 1
-                print(f"✅ Written to CSV: {clean_q[:50]}..." if len(clean_q) > 50 else f"✅ Written to CSV: {clean_q}")
+            with open(filepath, 'a' if resuming else 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                if resuming:
+                    log.info(f"♻️  Resuming: {base_count} questions already in file")
+                    known_questions = existing_questions
+                else:
+                    writer.writerow(['question', 'tag'])
+                    
+                    # Write seed questions first  
+                    log.info(f"📝 Writing {seed_count} seed questions...")
+                    known_questions = [clean_question(seed) for seed in seed_questions]
+                    writer.writerows((clean_q, tag) for clean_q in known_questions)
+                    if log.isEnabledFor(logging.DEBUG):
+                        for i, clean_q in enumerate(known_questions, 1):
+                            log.debug(f"  {i:2d}. {clean_q}")
+                    f.flush()  # Make the seeds visible before the (slow) generation starts
+                    
+                    log.info(f"✅ Wrote {seed_count} seed questions")
+                
+                # Generate more if needed
+                if questions_needed <= 0:
+                    log.info(f"✅ Target reached with seeds only")
+                    return filepath, base_count
+                
+                log.info(f"🤖 Generating {questions_needed} new questions...")
+                
+                added_count = 0
+                seen = {question_key(q) for q in known_questions}
+                new_rows = []
                 
-                if seed_count + added_count >= target_count:
-                    break
-            
-            print(f"✅ Added {added_count} new questions")
-            print(f"📊 Total in file: {seed_count + added_count}")
-            
-        except Exception as e:
-            print(f"❌ Error generating questions: {e}")
-            print(f"📊 File contains {seed_count} seed questions only")
-            print(f"🔄 You can run the script again to retry generation for this tag")
-    
-    return filepath
+                def add_generated_line(line):
+                    """Clean one streamed line and queue it for the CSV if it is a new, valid question."""
+                    nonlocal added_count
+                    clean_q = clean_question(line)
+                    if not is_valid_question(clean_q):
+                        return
+                    key = question_key(clean_q)
+                    if key in seen:
+                        return
+                    seen.add(key)
+                    new_rows.append((clean_q, tag))
+                    added_count += 1
+                    if log.isEnabledFor(logging.DEBUG):
+                        preview = clean_q if len(clean_q) <= 50 else clean_q[:50] + '...'
+                        log.debug(f"✅ Written to CSV: {preview}")
+                
+                try:
+                    if cached_text is not None:
+                        log.info("💾 Using cached response")
+                        received_chars = len(cached_text)
+                        for line in cached_text.split('\n'):
+                            if base_count + added_count >= target_count:
+                                break
+                            add_generated_line(line)
+                        writer.writerows(new_rows)
+                        if added_count == 0:
+                            # Replaying it again would add nothing either; drop it so the next run asks afresh
+                            discard_cached_response(cache_path)
+                            log.warning(f"⚠️  Cached response added no new questions; discarded it, run again to regenerate")
+                    else:
+                        log.info("🔄 Calling OpenAI (streaming)...")
+                        
+                        log.info(f"🎛️  Token limit: {api_params['max_completion_tokens']}")
+                        
+                        # Write each question as soon as its line is complete instead of
+                        # waiting for the whole completion
+                        received = []
+                        received_chars = 0
+                        pending = ""
+                        stopped_early = False
+                        # Closing the stream on every exit, early ones included, drops the HTTP
+                        # response so the model stops generating (and billing) unread tokens
+                        async with await stream_task as stream:
+                            async for chunk in stream:
+                                if not chunk.choices:
+                                    continue
+                                delta = chunk.choices[0].delta.content
+                                if not delta:
+                                    continue
+                                received.append(delta)
+                                received_chars += len(delta)
+                                *complete_lines, pending = (pending + delta).split('\n')
+                                for line in complete_lines:
+                                    if base_count + added_count >= target_count:
+                                        break
+                                    add_generated_line(line)
+                                # One writerows call per chunk rather than one writerow per line
+                                writer.writerows(new_rows)
+                                new_rows.clear()
+                                if base_count + added_count >= target_count:
+                                    stopped_early = True
+                                    break
+                        
+                        if pending and base_count + added_count < target_count:
+                            add_generated_line(pending)
+                            writer.writerows(new_rows)
+                        
+                        # A completion cut off at the target is not the full response for this request,
+                        # and one that added nothing would be replayed on every rerun without progress
+                        if not stopped_early and added_count > 0:
+                            save_cached_response(cache_path, ''.join(received))
+                    
+                    log.info(f"📡 Generated text length: {received_chars} characters")
+                    if received_chars == 0:
+                        log.warning(f"⚠️  Empty response detected!")
+                    
+                    log.info(f"✅ Added {added_count} new questions")
+                    log.info(f"📊 Total in file: {base_count + added_count}")
+                    
+                except Exception as e:
+                    log.error(f"❌ Error generating questions: {e}")
+                    log.error(f"📊 File contains {base_count + added_count} questions ({added_count} generated)")
+                    log.error(f"🔄 You can run the script again to retry generation for this tag")
+        finally:
+            # Only reached with a live task if writing the seeds failed
+            if stream_task is not None and not stream_task.done():
+                stream_task.cancel()
+    
+    return filepath, base_count + added_count
+
+async def process_tag(i, tag, target, total_tags):
+    """Generate one tag's CSV and report its row count and duration."""
+    seeds = SEED_DATA[tag]
+    
+    log.info(f"\n{'='*80}")
+    log.info(f"[{i+1}/{total_tags}] Processing: {tag}")
+    log.info(f"🎯 Target: {target} questions ({len(seeds)} seeds + {target-len(seeds)} new)")
+    log.info(f"{'='*80}")
+    
+    tag_start_time = time.time()
+    filepath, actual_count = await generate_questions_for_tag(tag, seeds, target)
+    tag_duration = time.time() - tag_start_time
+    
+    log.info(f"🎉 Completed: {os.path.basename(filepath)} ({actual_count} questions)")
+    log.info(f"⏱️  Time taken: {tag_duration:.1f} seconds")
+    log.info(f"📡 Monitor: tail -f {filepath}")
+    
+    return tag, filepath, actual_count, tag_duration
+
+async def generate_all_tags(tags, targets):
+    """Run every tag concurrently; results keep the order of `tags`."""
+    tasks = [
+        process_tag(i, tag, target, len(tags))
+        for i, (tag, target) in enumerate(zip(tags, targets))
+    ]
+    return await asyncio.gather(*tasks)
+
+def write_questions_csv(tag, seed_questions, generated_questions, target_count):
+    """Write seeds, rows kept from an earlier run, then generated questions for one tag; return (filepath, row count)."""
+    filepath = os.path.join(OUTPUT_DIR, f"{tag}.csv")
+    # Rows already generated (and paid for) by an earlier partial run survive a failed or empty response
+    existing_questions = read_existing_questions(filepath)
+    
+    with open(filepath, 'w', newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE) as f:
+        writer = csv.writer(f)
+        writer.writerow(['question', 'tag'])
+        
+        rows = [clean_question(seed) for seed in seed_questions]
+        seen = {question_key(q) for q in rows}
+        for question in chain(existing_questions, generated_questions):
+            if len(rows) >= target_count:
+                break
+            clean_q = clean_question(question)
+            key = question_key(clean_q)
+            if is_valid_question(clean_q) and key not in seen:
+                seen.add(key)
+                rows.append(clean_q)
+        
+        writer.writerows((clean_q, tag) for clean_q in rows)
+    
+    log.info(f"✅ {tag}: wrote {len(rows)} questions to {filepath}")
+    return filepath, len(rows)
+
+def build_bulk_prompt(seed_data, targets):
+    """Build one user prompt that asks for every tag in `targets` as a JSON object."""
+    tag_requests = [
+        {
+            "tag": tag,
+            "examples": seed_data[tag],
+            "count": max(target - len(seed_data[tag]), 0),
+            "pattern_analysis": PATTERN_ANALYSIS[tag],
+            "exclusions": EXCLUSION_RULES[tag],
+        }
+        for tag, target in targets.items()
+    ]
+    
+    return f"""For EACH tag below, generate `count` new Bengali questions that are 97-99% IDENTICAL in style, structure, and vocabulary to that tag's `examples`.
+
+CRITICAL REQUIREMENTS - Follow these EXACTLY for every tag:
+- Copy the exact sentence structures from the tag's examples
+- Use the same question words (কিভাবে, কি, কোথায়, কত, etc.) as in the examples
+- Use the same vocabulary, colloquial style, tone and question length
+- Replace only minimal words while keeping core structure identical
+- Follow the tag's `pattern_analysis` and NEVER break its `exclusions`
+
+TAGS:
+{json.dumps(tag_requests, ensure_ascii=False, indent=2)}
+
+Return ONLY a JSON object mapping each tag to its list of questions, e.g.
+{{"namjari_fee": ["...", "..."], "namjari_process": ["...", "..."]}}"""
+
+async def generate_tag_group(seed_data, targets):
+    """Generate a group of tags in a single JSON-mode request, then fan out per-tag CSV writes."""
+    log.info(f"🤖 Generating {len(targets)} tags in one request: {', '.join(targets)}")
+    
+    api_params = {
+        "model": MODEL,
+        "messages": [
+            {"role": "system", "content": JSON_SYSTEM_PROMPT},
+            {"role": "user", "content": build_bulk_prompt(seed_data, targets)}
+        ],
+        "response_format": {"type": "json_object"},
+        "max_completion_tokens": completion_token_budget(
+            sum(max(target - len(seed_data[tag]), 0) for tag, target in targets.items()),
+            cap=BULK_MAX_COMPLETION_TOKENS,
+        ),
+    }
+    
+    start_time = time.time()
+    cache_path = response_cache_path({"targets": targets, "seeds": {tag: seed_data[tag] for tag in targets}})
+    generated_text = load_cached_response(cache_path)
+    try:
+        if generated_text is not None:
+            log.info("💾 Using cached response")
+        else:
+            generated_text = "{}"
+            async with request_semaphore:
+                response = await create_completion(api_params)
+            generated_text = response.choices[0].message.content or "{}"
+            log.info(f"📡 Generated text length: {len(generated_text)} characters")
+    except Exception as e:
+        log.error(f"❌ Error generating questions: {e}")
+        log.error(f"🔄 Files will contain seed questions only; run the script again to retry")
+    duration = time.time() - start_time
+    
+    files_created = []
+    generated = parse_json_object(generated_text)
+    if generated:
+        save_cached_response(cache_path, generated_text)
+    for tag, target in targets.items():
+        questions = extract_questions(generated, key=tag)
+        filepath, count = write_questions_csv(tag, seed_data[tag], questions, target)
+        files_created.append((tag, filepath, count, duration))
+    
+    return files_created
+
+async def generate_all_tags_bulk(seed_data, targets):
+    """Generate all tags in one request ("bulk") or in concurrent groups of TAGS_PER_REQUEST ("grouped")."""
+    group_size = len(targets) if GENERATION_MODE == "bulk" else TAGS_PER_REQUEST
+    items = list(targets.items())
+    groups = [dict(items[i:i + group_size]) for i in range(0, len(items), group_size)]
+    results = await asyncio.gather(*(generate_tag_group(seed_data, group) for group in groups))
+    return [entry for group_files in results for entry in group_files]
+
+def load_batch_state(input_digest):
+    """Return the id of a batch submitted earlier for the same input, or None."""
+    try:
+        with open(BATCH_STATE_FILE, 'rb') as f:
+            state = json_loads(f.read())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(state, dict) or state.get("input_sha256") != input_digest:
+        return None
+    return state.get("batch_id")
+
+def save_batch_state(batch_id, input_digest):
+    """Record the in-flight batch so a rerun picks it up instead of paying for a new one."""
+    with open(BATCH_STATE_FILE, 'w', encoding='utf-8') as f:
+        json.dump({"batch_id": batch_id, "input_sha256": input_digest}, f)
+
+def log_batch_record_error(record):
+    """Report why one batch request produced no questions."""
+    response = record.get("response") or {}
+    error = record.get("error") or (response.get("body") or {}).get("error") or f"HTTP {response.get('status_code')}"
+    if isinstance(error, dict):
+        error = error.get("message") or error
+    log.error(f"❌ {record.get('custom_id')}: {error}")
+
+async def submit_or_resume_batch(input_digest, tag_count):
+    """Resume the batch recorded for this input if it is still usable, else upload and submit a new one."""
+    batch_id = load_batch_state(input_digest)
+    if batch_id is not None:
+        batch = await client.batches.retrieve(batch_id)
+        # A batch that completed with every request failed has no output worth resuming
+        dead = batch.status in ("failed", "expired", "cancelled") or (
+            batch.status == "completed" and not batch.output_file_id
+        )
+        if not dead:
+            log.info(f"📦 Resuming batch {batch.id} ({batch.status})")
+            return batch
+    
+    with open(BATCH_INPUT_FILE, 'rb') as f:
+        batch_file = await client.files.create(file=f, purpose="batch")
+    batch = await client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    save_batch_state(batch.id, input_digest)
+    log.info(f"📦 Submitted batch {batch.id} ({tag_count} tags)")
+    return batch
+
+async def generate_all_tags_batch(seed_data, targets):
+    """Submit every tag to the OpenAI Batch API, wait for it, then write per-tag CSVs."""
+    lines = []
+    for tag, target in targets.items():
+        questions_needed = target - len(seed_data[tag])
+        if questions_needed <= 0:
+            continue
+        request = {
+            "custom_id": tag,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": build_api_params(
+                build_generation_prompt(tag, seed_data[tag], questions_needed), questions_needed, json_output=True
+            ),
+        }
+        lines.append(json.dumps(request, ensure_ascii=False) + "\n")
+    with open(BATCH_INPUT_FILE, 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+    input_digest = request_digest({"batch_targets": targets, "seeds": {tag: seed_data[tag] for tag in targets}})
+    
+    start_time = time.time()
+    generated = {}
+    try:
+        batch = await submit_or_resume_batch(input_digest, len(targets))
+        
+        poll_interval = BATCH_POLL_INITIAL_INTERVAL
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            await asyncio.sleep(poll_interval)
+            poll_interval = min(poll_interval * 2, BATCH_POLL_MAX_INTERVAL)
+            batch = await client.batches.retrieve(batch.id)
+            log.info(f"⏳ Batch {batch.id}: {batch.status}")
+        
+        if batch.status == "completed" and batch.output_file_id:
+            output = await client.files.content(batch.output_file_id)
+            for line in output.text.splitlines():
+                record = json_loads(line)
+                response = record.get("response") or {}
+                choices = (response.get("body") or {}).get("choices") or []
+                if record.get("error") or response.get("status_code") != 200 or not choices:
+                    log_batch_record_error(record)
+                    continue
+                generated[record["custom_id"]] = choices[0]["message"]["content"] or ""
+        else:
+            log.error(f"❌ Batch {batch.id} ended with status {batch.status} and no output file")
+        
+        # Requests that failed outright are only listed in the error file
+        if batch.error_file_id:
+            log.error(f"❌ Batch {batch.id} has failed requests (error file {batch.error_file_id})")
+            errors = await client.files.content(batch.error_file_id)
+            for line in errors.text.splitlines():
+                log_batch_record_error(json_loads(line))
+        
+        # The batch is finished and its results are read; a rerun must submit a new one, not resume this
+        with contextlib.suppress(OSError):
+            os.remove(BATCH_STATE_FILE)
+    except Exception as e:
+        log.error(f"❌ Error running batch: {e}")
+        log.error(f"🔄 Files will contain seed questions only; run the script again to retry")
+    duration = time.time() - start_time
+    
+    files_created = []
+    for tag, target in targets.items():
+        questions = extract_questions(parse_json_object(generated.get(tag)))
+        filepath, count = write_questions_csv(tag, seed_data[tag], questions, target)
+        files_created.append((tag, filepath, count, duration))
+    
+    return files_created
+
+async def generate_dataset(tags, targets):
+    """Run the configured generation mode."""
+    if GENERATION_MODE in ("bulk", "grouped", "batch"):
+        generate = generate_all_tags_batch if GENERATION_MODE == "batch" else generate_all_tags_bulk
+        # Tags whose CSV already meets the target are left out of the request entirely
+        files_created = []
+        pending_targets = {}
+        for tag, target in zip(tags, targets):
+            filepath = os.path.join(OUTPUT_DIR, f"{tag}.csv")
+            existing_count = len(read_existing_questions(filepath))
+            if existing_count >= target:
+                log.info(f"✅ {tag}: already complete with {existing_count} questions, skipping")
+                files_created.append((tag, filepath, existing_count, 0.0))
+            else:
+                pending_targets[tag] = target
+        if pending_targets:
+            files_created.extend(await generate(SEED_DATA, pending_targets))
+        return files_created
+    return await generate_all_tags(tags, targets)
 
 def main():
-    print("🚀 Namjari Question Generator - PRODUCTION MODE (All 13 Tags)")
-    print("=" * 80)
-    print(f"🎯 Target: {TARGET_ROWS} questions across 13 tags")
-    print(f"📺 Will show all generated questions streaming!")
-    print(f"🔧 Model: {MODEL}")
-    print(f"📁 Output: {OUTPUT_DIR}/ (individual files)")
-    print("=" * 80)
+    listener = start_log_listener()
+    try:
+        run_generation()
+    finally:
+        listener.stop()
+
+def run_generation():
+    log.info("🚀 Namjari Question Generator - PRODUCTION MODE (All 13 Tags)")
+    log.info("=" * 80)
+    log.info(f"🎯 Target: {TARGET_ROWS} questions across 13 tags")
+    if log.isEnabledFor(logging.DEBUG):
+        log.info(f"📺 Will show all generated questions streaming!")
+    log.info(f"🔧 Model: {MODEL}")
+    log.info(f"🧩 Mode: {GENERATION_MODE}")
+    log.info(f"⚡ Concurrency: up to {MAX_CONCURRENT_REQUESTS} tags in parallel")
+    log.info(f"🚦 Rate limits: {MAX_REQUESTS_PER_MINUTE} requests/min, {MAX_TOKENS_PER_MINUTE} tokens/min")
+    log.info(f"📁 Output: {OUTPUT_DIR}/ (individual files)")
+    log.info("=" * 80)
     
     # Process all tags
     all_tags = list(SEED_DATA.keys())
@@ -459,70 +998,56 @@ def main():
     base_count = TARGET_ROWS // len(tags)
     remainder = TARGET_ROWS % len(tags)
     
-    print(f"📊 Distribution: {base_count} questions per tag")
+    # Per-tag targets are fixed up front so every task gets its count directly
+    targets = tuple(base_count + (1 if i < remainder else 0) for i in range(len(tags)))
+    
+    log.info(f"📊 Distribution: {base_count} questions per tag")
     if remainder > 0:
-        print(f"📊 Extra: {remainder} tags will get +1 question")
+        log.info(f"📊 Extra: {remainder} tags will get +1 question")
     
-    files_created = []
+    # Seeds shared between tags produce overlapping (mislabelled) generations
+    overlaps = find_overlapping_seeds(SEED_DATA)
+    for entries in overlaps.values():
+        log.warning(f"⚠️  Seed shared across tags: {', '.join(tag for tag, _ in entries)} → \"{entries[0][1]}\"")
+    if not overlaps:
+        log.info("✅ No seed overlap across tags")
     
-    start_time = time.time()
+    # Create output and cache directories once; every tag writes into them concurrently
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    if RESPONSE_CACHE_DIR is not None:
+        os.makedirs(RESPONSE_CACHE_DIR, exist_ok=True)
     
-    for i, tag in enumerate(tags):
-        target = base_count + (1 if i < remainder else 0)
-        seeds = SEED_DATA[tag]
-        
-        print(f"\n{'='*80}")
-        print(f"[{i+1}/{len(tags)}] Processing: {tag}")
-        print(f"🎯 Target: {target} questions ({len(seeds)} seeds + {target-len(seeds)} new)")
-        print(f"{'='*80}")
-        
-        tag_start_time = time.time()
-        filepath = generate_questions_for_tag(tag, seeds, target)
-        tag_duration = time.time() - tag_start_time
-        
-        # Count actual questions in file
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                actual_count = sum(1 for _ in reader)
-        except Exception as e:
-            print(f"⚠️ Warning: Could not count questions in file: {e}")
-            actual_count = len(seeds)
-            
-        files_created.append((tag, filepath, actual_count, tag_duration))
-        
-        print(f"🎉 Completed: {os.path.basename(filepath)} ({actual_count} questions)")
-        print(f"⏱️  Time taken: {tag_duration:.1f} seconds")
-        print(f"📡 Monitor: tail -f {filepath}")
+    start_time = time.time()
+    files_created = asyncio.run(generate_dataset(tags, targets))
     
     # Summary
     total_duration = time.time() - start_time
     total_questions = sum(count for _, _, count, _ in files_created)
     
-    print(f"\n🏆 ALL DONE!")
-    print("=" * 80)
-    print(f"📁 Directory: {OUTPUT_DIR}/")
-    print(f"📄 Files: {len(files_created)}")
-    print(f"📊 Total questions: {total_questions}")
-    print(f"⏱️  Total time: {total_duration:.1f} seconds")
-    print(f"⚡ Average: {total_questions/total_duration:.1f} questions/second")
-    print("=" * 80)
-    
-    print(f"\n📋 Detailed Results:")
-    print(f"{'Tag':<30} {'File':<35} {'Questions':<10} {'Time(s)':<8}")
-    print("-" * 85)
+    log.info(f"\n🏆 ALL DONE!")
+    log.info("=" * 80)
+    log.info(f"📁 Directory: {OUTPUT_DIR}/")
+    log.info(f"📄 Files: {len(files_created)}")
+    log.info(f"📊 Total questions: {total_questions}")
+    log.info(f"⏱️  Total time: {total_duration:.1f} seconds")
+    log.info(f"⚡ Average: {total_questions/total_duration:.1f} questions/second")
+    log.info("=" * 80)
+    
+    log.info(f"\n📋 Detailed Results:")
+    log.info(f"{'Tag':<30} {'File':<35} {'Questions':<10} {'Time(s)':<8}")
+    log.info("-" * 85)
     for tag, filepath, count, duration in files_created:
         filename = os.path.basename(filepath)
-        print(f"{tag:<30} {filename:<35} {count:<10} {duration:<8.1f}")
+        log.info(f"{tag:<30} {filename:<35} {count:<10} {duration:<8.1f}")
     
-    print(f"\n📡 Monitor commands:")
-    print("   ls -la namjari_questions/")
-    print("   wc -l namjari_questions/*.csv")
-    print("   find namjari_questions/ -name '*.csv' -exec wc -l {} + | sort -n")
+    log.info(f"\n📡 Monitor commands:")
+    log.info("   ls -la namjari_questions/")
+    log.info("   wc -l namjari_questions/*.csv")
+    log.info("   find namjari_questions/ -name '*.csv' -exec wc -l {} + | sort -n")
     
-    print(f"\n🎯 Mission Accomplished!")
-    print(f"   Generated {total_questions} Bengali questions across {len(files_created)} namjari topics!")
-    print(f"   Ready for dataset training! 🚀")
+    log.info(f"\n🎯 Mission Accomplished!")
+    log.info(f"   Generated {total_questions} Bengali questions across {len(files_created)} namjari topics!")
+    log.info(f"   Ready for dataset training! 🚀")
 
 if __name__ == "__main__":
     main()
@@ -4,15 +4,37 @@ Pattern Definitions for Bengali Namjari Q&A Classification
 Organized pattern matching for different categories
 """
 
+import functools
+import hashlib
+import os
 import re
-from typing import List, Dict, NamedTuple, Optional, Tuple
+import unicodedata
+from dataclasses import dataclass, replace
+from itertools import chain
+from operator import attrgetter
+from typing import List, Dict, Optional, Tuple
 
+try:
+    import hyperscan
+except ImportError:  # Optional: without it patterns are tried one compiled regex at a time
+    hyperscan = None
 
-class PatternMatch(NamedTuple):
+try:
+    import ahocorasick
+except ImportError:  # Optional: without it every pattern's regex is tried
+    ahocorasick = None
+
+# Serialized Hyperscan databases; compiling the pattern bank takes ~0.25 s, loading it ~0.1 ms
+PATTERN_DATABASE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.pattern_cache')
+
+
+@dataclass(frozen=True, slots=True)  # Slot reads are cheaper than tuple field lookups in the match loop
+class PatternMatch:
     pattern: str
     tag: str
     priority: int
     description: str
+    regex: Optional[re.Pattern] = None  # Filled in once by compile_all_patterns
 
 
 def get_critical_failure_patterns() -> List[PatternMatch]:
@@ -209,44 +231,188 @@ def get_anti_confusion_patterns() -> Dict[str, List[str]]:
     }
 
 
+def normalize_query(text: str) -> str:
+    """NFKC form shared by queries and pattern text
+    
+    Bengali text arrives with both precomposed and decomposed nukta letters
+    (e.g. U+09DF vs U+09AF U+09BC for য়); NFKC maps both to one sequence so
+    literal pattern text matches either spelling.
+    """
+    return unicodedata.normalize('NFKC', text)
+
+
 def compile_all_patterns():
-    """Compile all patterns into a single organized list"""
-    all_patterns = []
+    """Compile all patterns into a single organized list
     
+    Every regex is compiled here once, so matching a query never goes
+    through re.search's per-call pattern cache lookup. The build itself
+    runs once per process; each call returns fresh containers over the
+    shared immutable PatternMatch objects and compiled regexes.
+    """
+    all_patterns, anti_patterns = _compiled_patterns()
+    return list(all_patterns), dict(anti_patterns)
+
+
+@functools.cache
+def _compiled_patterns():
     # Add patterns by priority
-    all_patterns.extend(get_critical_failure_patterns())
-    all_patterns.extend(get_inheritance_patterns())
-    all_patterns.extend(get_application_procedure_patterns())
-    all_patterns.extend(get_representative_patterns())
-    all_patterns.extend(get_status_patterns())
-    all_patterns.extend(get_hearing_patterns())
-    all_patterns.extend(get_rejection_patterns())
-    all_patterns.extend(get_khatian_patterns())
-    all_patterns.extend(get_fee_and_document_patterns())
-    all_patterns.extend(get_conversation_patterns())
-    all_patterns.extend(get_simple_patterns())
-    all_patterns.extend(get_irrelevant_patterns())
+    all_patterns = list(chain(
+        get_critical_failure_patterns(),
+        get_inheritance_patterns(),
+        get_application_procedure_patterns(),
+        get_representative_patterns(),
+        get_status_patterns(),
+        get_hearing_patterns(),
+        get_rejection_patterns(),
+        get_khatian_patterns(),
+        get_fee_and_document_patterns(),
+        get_conversation_patterns(),
+        get_simple_patterns(),
+        get_irrelevant_patterns(),
+    ))
     
     # Sort by priority (lower number = higher priority)
-    all_patterns.sort(key=lambda x: x.priority)
+    all_patterns.sort(key=attrgetter('priority'))
+    all_patterns = [replace(p, pattern=normalize_query(p.pattern)) for p in all_patterns]
+    all_patterns = [replace(p, regex=re.compile(p.pattern, re.IGNORECASE)) for p in all_patterns]
+    
+    # One alternation per tag: "any anti-pattern matches" is exactly "the alternation matches"
+    anti_patterns = {
+        tag: re.compile('|'.join(f'(?:{normalize_query(anti_pattern)})' for anti_pattern in tag_anti_patterns), re.IGNORECASE)
+        for tag, tag_anti_patterns in get_anti_confusion_patterns().items()
+    }
+    
+    return tuple(all_patterns), anti_patterns
+
+
+def build_pattern_database(patterns: List[PatternMatch]):
+    """Compile all patterns into one Hyperscan database scanned in a single pass
+    
+    Returns None when Hyperscan is not installed or rejects a pattern, in
+    which case match_patterns falls back to the compiled regexes.
+    """
+    if hyperscan is None or not patterns:
+        return None
+    flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP | hyperscan.HS_FLAG_SINGLEMATCH
+    expressions = [p.pattern.encode('utf-8') for p in patterns]
+    
+    key = hashlib.sha1(repr((getattr(hyperscan, '__version__', ''), flags, expressions)).encode('utf-8')).hexdigest()
+    cache_path = os.path.join(PATTERN_DATABASE_CACHE_DIR, f"{key}.hsdb")
+    try:
+        with open(cache_path, 'rb') as f:
+            database = hyperscan.loadb(f.read(), hyperscan.HS_MODE_BLOCK)
+        database.scratch = hyperscan.Scratch(database)
+        return database
+    except Exception:
+        pass  # Missing, stale or built for another CPU: compile below
+    
+    database = hyperscan.Database()
+    try:
+        database.compile(
+            expressions=expressions,
+            ids=list(range(len(patterns))),
+            elements=len(patterns),
+            flags=[flags] * len(patterns),
+        )
+    except Exception:
+        return None
+    
+    try:
+        os.makedirs(PATTERN_DATABASE_CACHE_DIR, exist_ok=True)
+        with open(cache_path + '.tmp', 'wb') as f:
+            f.write(hyperscan.dumpb(database))
+        os.replace(cache_path + '.tmp', cache_path)
+    except OSError:
+        pass  # Read-only checkout: just compile again next time
+    return database
+
+
+def required_literals(pattern: str) -> Optional[List[str]]:
+    """Literals of which at least one must occur in any query the pattern matches
     
-    anti_patterns = get_anti_confusion_patterns()
+    Only handles the shapes used in this file (literals joined by '.*',
+    optionally wrapped in one alternation group and anchors); returns None
+    for anything else so that pattern is always tried.
+    """
+    body = pattern
+    if body.startswith('^'):
+        body = body[1:]
+    for suffix in (r'[\s।]*$', '$'):
+        if body.endswith(suffix):
+            body = body[:-len(suffix)]
+            break
+    if body.startswith('(') and body.endswith(')') and body.count('(') == 1:
+        body = body[1:-1]
     
-    return all_patterns, anti_patterns
+    literals = []
+    for alternative in body.split('|'):
+        if re.search(r'[()\[\]\\?+{}^$]|(?<!\.)\*', alternative):
+            return None
+        pieces = [piece for piece in re.split(r'\.\*|\.', alternative) if piece]
+        if not pieces:
+            return None
+        literal = max(pieces, key=len)
+        if literal.lower() != literal.upper():  # Cased text would need IGNORECASE-aware matching
+            return None
+        literals.append(literal)
+    return literals
+
+
+def build_literal_prefilter(patterns: List[PatternMatch]):
+    """Aho-Corasick automaton over required literals, mapping each to the patterns that need it
+    
+    Returns (automaton, always_tried_indices), or None when pyahocorasick is
+    not installed.
+    """
+    if ahocorasick is None or not patterns:
+        return None
+    literal_to_indices: Dict[str, List[int]] = {}
+    always_tried = []
+    for i, pattern in enumerate(patterns):
+        literals = required_literals(pattern.pattern)
+        if literals is None:
+            always_tried.append(i)
+            continue
+        for literal in literals:
+            literal_to_indices.setdefault(literal, []).append(i)
+    
+    automaton = ahocorasick.Automaton()
+    for literal, indices in literal_to_indices.items():
+        automaton.add_word(literal, indices)
+    automaton.make_automaton()
+    return automaton, always_tried
 
 
-def match_patterns(query: str, patterns: List[PatternMatch]) -> Optional[PatternMatch]:
-    """Match query against patterns in priority order"""
+def match_patterns(query: str, patterns: List[PatternMatch], database=None, prefilter=None) -> Optional[PatternMatch]:
+    """Match query against patterns in priority order
+    
+    Pass queries through normalize_query first; patterns are stored normalized.
+    """
+    if database is not None:
+        # Hyperscan reports matches by end offset; the lowest id is the highest-priority pattern
+        matched_ids = []
+        database.scan(
+            query.encode('utf-8'),
+            match_event_handler=lambda pattern_id, start, end, flags, context: matched_ids.append(pattern_id),
+        )
+        return patterns[min(matched_ids)] if matched_ids else None
+    
+    if prefilter is not None:
+        # One linear scan finds the patterns whose required literals occur; only those run their regex
+        automaton, always_tried = prefilter
+        candidates = set(always_tried)
+        for _, indices in automaton.iter(query):
+            candidates.update(indices)
+        patterns = [patterns[i] for i in sorted(candidates)]
+    
     for pattern in patterns:
-        if re.search(pattern.pattern, query, re.IGNORECASE):
+        regex = pattern.regex or re.compile(pattern.pattern, re.IGNORECASE)
+        if regex.search(query):
             return pattern
     return None
 
 
-def check_anti_patterns(query: str, predicted_tag: str, anti_patterns: Dict[str, List[str]]) -> bool:
+def check_anti_patterns(query: str, predicted_tag: str, anti_patterns: Dict[str, re.Pattern]) -> bool:
     """Check if prediction should be blocked by anti-patterns"""
-    if predicted_tag in anti_patterns:
-        for anti_pattern in anti_patterns[predicted_tag]:
-            if re.search(anti_pattern, query, re.IGNORECASE):
-                return True
-    return False
\ No newline at end of file
+    anti_pattern = anti_patterns.get(predicted_tag)
+    return anti_pattern is not None and anti_pattern.search(query) is not None
\ No newline at end of file